@@ -1,12 +1,10 @@
-from django.conf.urls import patterns, include, url
-
 from django.contrib import admin
-admin.autodiscover()
+from django.urls import path
 
-urlpatterns = patterns('',
+urlpatterns = [
     # Examples:
-    # url(r'^$', 'example.views.home', name='home'),
-    # url(r'^blog/', include('blog.urls')),
+    # path('', views.home, name='home'),
+    # path('blog/', include('blog.urls')),
 
-    url(r'^admin/', include(admin.site.urls)),
-)
+    path('admin/', admin.site.urls),
+]
@@ -18,5 +18,9 @@ class PublishableModelAdmin(FSMTransitionMixin, admin.ModelAdmin):
     readonly_fields = (
         'state',
     )
+    actions = (
+        'export_fsm_transitions_csv',
+        'export_fsm_transitions_json',
+    )
 
 admin.site.register(PublishableModel, PublishableModelAdmin)
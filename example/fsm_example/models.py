@@ -46,6 +46,9 @@ class PublishableModel(models.Model):
     def __unicode__(self):
         return self.name
 
+    def __str__(self):
+        return self.name
+
     ########################################################
     # Transition Conditions
     # These must be defined prior to the actual transitions
@@ -92,7 +95,8 @@ class PublishableModel(models.Model):
         '''
 
     @transition(field=state, source=State.PUBLISHED, target=State.EXPIRED,
-        conditions=[has_display_dates])
+        conditions=[has_display_dates],
+        custom=dict(admin=False))
     def expire(self):
         '''
         Automatically called when a object is detected as being not
@@ -111,3 +115,11 @@ class PublishableModel(models.Model):
         '''
         After reviewed by stakeholders, the Page is approved.
         '''
+
+    @transition(field=state, source=[State.DRAFT, State.APPROVED, State.EXPIRED],
+        target=State.DELETED,
+        custom=dict(confirm=True))
+    def remove(self):
+        '''
+        Soft delete the object, the admin asks for confirmation first.
+        '''
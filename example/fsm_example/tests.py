@@ -1,3 +1,262 @@
+import csv
+import json
+import re
+import warnings
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.http import StreamingHttpResponse
 from django.test import TestCase
+from django.test.utils import override_settings
+try:
+    from django.urls import reverse
+except ImportError:
+    from django.core.urlresolvers import reverse
+from django.utils import timezone
+
+from fsm_admin.testing import FSMAdminBudgetTestMixin
+from fsm_example.models import PublishableModel, State
+
+
+# Upper bounds for the PublishableModel admin, as measured on Django 4.2 and
+# django-fsm 2.8.1, raise them consciously
+CHANGE_VIEW_MAX_QUERIES = 6
+TRANSITION_MAX_QUERIES = 7
+CHANGELIST_MAX_QUERIES = 5
+# `publish` conditions are evaluated once for the submit row and once for
+# the hints
+CHANGE_VIEW_MAX_CONDITIONS = 2
+# `publish` conditions are evaluated once to check the transition is
+# available, then by django-fsm on each of the three attempts to call it
+# in `_do_transition` (with `request` and `by`, with `by`, without arguments)
+TRANSITION_MAX_CONDITIONS = 4
+
+
+@override_settings(DEBUG=True)
+class PublishableModelAdminBudgetTests(FSMAdminBudgetTestMixin, TestCase):
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        self.obj = PublishableModel.objects.create(name='Post', state=State.APPROVED)
+        self.change_url = reverse('admin:fsm_example_publishablemodel_change', args=(self.obj.pk,))
+        self.model_admin = admin.site._registry[PublishableModel]
+
+    def count_condition_calls(self):
+        # `can_display` delegates to `check_displayable`
+        return mock.patch.object(
+            PublishableModel, 'check_displayable', autospec=True,
+            side_effect=PublishableModel.check_displayable)
+
+    def test_change_view(self):
+        with self.count_condition_calls() as check_displayable:
+            with self.assertMaxQueries(CHANGE_VIEW_MAX_QUERIES):
+                response = self.client.get(self.change_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '_fsmtransition-state-publish')
+        self.assertMaxConditions(CHANGE_VIEW_MAX_CONDITIONS, response)
+        self.assertEqual(
+            check_displayable.call_count, response.wsgi_request._fsm_admin_budget['conditions'])
+
+    def test_transition(self):
+        data = {
+            'name': 'Post',
+            'display_from_0': '',
+            'display_from_1': '',
+            'display_until_0': '',
+            'display_until_1': '',
+            '_fsmtransition-state-publish': 'Publish Post',
+        }
+        with self.count_condition_calls() as check_displayable:
+            with self.assertMaxQueries(TRANSITION_MAX_QUERIES):
+                response = self.client.post(self.change_url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(PublishableModel.objects.get(pk=self.obj.pk).state, State.PUBLISHED)
+        self.assertMaxConditions(TRANSITION_MAX_CONDITIONS, response)
+        self.assertEqual(
+            check_displayable.call_count, response.wsgi_request._fsm_admin_budget['conditions'])
+
+    def test_changelist(self):
+        PublishableModel.objects.bulk_create(
+            PublishableModel(name='Post %d' % i) for i in range(20))
+        with self.assertMaxQueries(CHANGELIST_MAX_QUERIES):
+            response = self.client.get(reverse('admin:fsm_example_publishablemodel_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertMaxConditions(0, response)
+
+    def test_conditions_left_untouched(self):
+        publish = PublishableModel.publish._django_fsm.get_transition(State.APPROVED)
+        conditions = list(publish.conditions)
+        self.client.get(self.change_url)
+        self.assertEqual(publish.conditions, conditions)
+        self.assertIs(publish.conditions[0], PublishableModel.can_display)
+
+    def test_budget_cleanup_on_error(self):
+        user = User.objects.create_user('viewer', 'viewer@example.com', 'password', is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename='view_publishablemodel'))
+        self.client.login(username='viewer', password='password')
+        response = self.client.post(self.change_url, {'_fsmtransition-state-publish': 'Publish Post'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(connection.execute_wrappers, [])
+
+    @override_settings(FSM_ADMIN_CONDITION_BUDGET=0)
+    def test_condition_budget_warning(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.client.get(self.change_url)
+        self.assertTrue(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+    @override_settings(FSM_ADMIN_CONDITION_BUDGET=TRANSITION_MAX_CONDITIONS - 1)
+    def test_condition_budget_warning_on_transition(self):
+        data = {
+            'name': 'Post',
+            'display_from_0': '',
+            'display_from_1': '',
+            'display_until_0': '',
+            'display_until_1': '',
+            '_fsmtransition-state-publish': 'Publish Post',
+        }
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.client.post(self.change_url, data)
+        self.assertTrue(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+    @override_settings(FSM_ADMIN_QUERY_BUDGET=0)
+    def test_query_budget_warning(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.client.get(self.change_url)
+        self.assertTrue(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+    @override_settings(FSM_ADMIN_QUERY_BUDGET=0)
+    def test_admin_budget_overrides_setting(self):
+        with mock.patch.object(self.model_admin, 'fsm_query_budget', CHANGE_VIEW_MAX_QUERIES):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                self.client.get(self.change_url)
+        self.assertFalse(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+    @override_settings(DEBUG=False, FSM_ADMIN_CONDITION_BUDGET=0)
+    def test_no_budget_tracking_without_debug(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response = self.client.get(self.change_url)
+        self.assertFalse(any(issubclass(w.category, RuntimeWarning) for w in caught))
+        self.assertFalse(hasattr(response.wsgi_request, '_fsm_admin_budget'))
+
+
+class PublishableModelAdminExportTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        now = timezone.now()
+        self.draft = PublishableModel.objects.create(name='Draft, "quoted"', state=State.DRAFT)
+        # Display dates in the past, `publish` is not available
+        self.approved = PublishableModel.objects.create(
+            name='Approved', state=State.APPROVED,
+            display_from=now - timedelta(days=2), display_until=now - timedelta(days=1))
+        # `expire` conditions are met, but it is hidden from the admin
+        self.published = PublishableModel.objects.create(
+            name='Published', state=State.PUBLISHED,
+            display_from=now - timedelta(days=1), display_until=now + timedelta(days=1))
+
+    def export(self, action):
+        response = self.client.post(reverse('admin:fsm_example_publishablemodel_changelist'), {
+            'action': action,
+            '_selected_action': [self.draft.pk, self.approved.pk, self.published.pk],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_csv(self):
+        content = self.export('export_fsm_transitions_csv')
+        self.assertIn('"Draft, ""quoted"""', content)
+
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(rows[0], ['pk', 'object', 'state', 'state_transitions', 'hints'])
+        rows = dict((int(row[0]), row[1:]) for row in rows[1:])
+        self.assertEqual(rows, {
+            self.draft.pk: ['Draft, "quoted"', State.DRAFT, 'approve remove', ''],
+            self.approved.pk: [
+                'Approved', State.APPROVED, 'remove',
+                'Publish: The display dates may need to be adjusted.'],
+            self.published.pk: ['Published', State.PUBLISHED, 'unpublish', ''],
+        })
+
+    def test_export_json(self):
+        content = self.export('export_fsm_transitions_json')
+
+        rows = dict((row['pk'], row) for row in json.loads(content))
+        self.assertEqual(rows[self.draft.pk], {
+            'pk': self.draft.pk,
+            'object': 'Draft, "quoted"',
+            'state': State.DRAFT,
+            'state_transitions': ['approve', 'remove'],
+            'hints': {},
+        })
+        self.assertEqual(rows[self.approved.pk]['state_transitions'], ['remove'])
+        self.assertEqual(rows[self.approved.pk]['hints'], {
+            'Publish': ['The display dates may need to be adjusted.'],
+        })
+        self.assertEqual(rows[self.published.pk]['state_transitions'], ['unpublish'])
+        self.assertEqual(rows[self.published.pk]['hints'], {})
+
+    def test_export_csv_formulas(self):
+        PublishableModel.objects.filter(pk=self.draft.pk).update(name='=1+1')
+        content = self.export('export_fsm_transitions_csv')
+
+        rows = dict((row[0], row[1:]) for row in csv.reader(content.splitlines()))
+        self.assertEqual(rows[str(self.draft.pk)][0], "'=1+1")
+
+    def test_export_evaluates_conditions_once(self):
+        PublishableModel.objects.bulk_create(
+            PublishableModel(name='Post %d' % i, state=State.APPROVED) for i in range(9))
+        with mock.patch.object(
+                PublishableModel, 'check_displayable', autospec=True,
+                side_effect=PublishableModel.check_displayable) as check_displayable:
+            response = self.client.post(reverse('admin:fsm_example_publishablemodel_changelist'), {
+                'action': 'export_fsm_transitions_json',
+                '_selected_action': PublishableModel.objects.values_list('pk', flat=True),
+            })
+            rows = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        # `publish` has one condition, and it is the only transition with
+        # conditions possible from the approved state
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(check_displayable.call_count, 10)
+
+
+class PublishableModelAdminSubmitRowTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        self.obj = PublishableModel.objects.create(name='Post', state=State.APPROVED)
+        self.change_url = reverse('admin:fsm_example_publishablemodel_change', args=(self.obj.pk,))
+
+    def get_button(self, content, transition):
+        match = re.search(r'<input[^>]*name="_fsmtransition-state-%s"[^>]*>' % transition, content)
+        self.assertIsNotNone(match, 'No button for %s' % transition)
+        return match.group(0)
+
+    def test_confirm_transition(self):
+        content = self.client.get(self.change_url).content.decode('utf-8')
+        self.assertIn('onclick="return confirm(', self.get_button(content, 'remove'))
+        self.assertNotIn('onclick', self.get_button(content, 'publish'))
 
-# Create your tests here.
+    def test_transition_result(self):
+        data = {
+            'name': 'Post',
+            'display_from_0': '',
+            'display_from_1': '',
+            'display_until_0': '',
+            'display_until_1': '',
+            '_fsmtransition-state-remove': 'Remove Post',
+        }
+        response = self.client.post(self.change_url, data, follow=True)
+        self.assertContains(response, 'Post successfully set to deleted')
+        self.assertEqual(PublishableModel.objects.get(pk=self.obj.pk).state, State.DELETED)
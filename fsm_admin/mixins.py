@@ -1,6 +1,9 @@
 from __future__ import unicode_literals
 
+import csv
+import warnings
 from collections import defaultdict
+from contextlib import ExitStack
 
 import django
 from django.conf import settings
@@ -11,12 +14,77 @@ if django.VERSION < (4, 0):
 else:
     from django.utils.encoding import force_str
     from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language
 from django.contrib.admin.templatetags.admin_urls import add_preserved_filters
-from django.http import HttpResponseRedirect
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 
 from django_fsm import ConcurrentTransition
 
 
+class _Echo(object):
+    """
+    File-like object for `csv.writer` that hands back each written row
+    instead of buffering it, so rows can be streamed one at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    """
+    Prefixes text that spreadsheets would run as a formula with a quote.
+    """
+    if isinstance(value, type('')) and value.startswith(('=', '+', '-', '@', '\t', '\r')):
+        return "'" + value
+    return value
+
+
+class AdminTransition(object):
+    """
+    Immutable description of a model transition as presented in the admin.
+
+    Built once per model transition by `FSMTransitionMixin.get_admin_transition`
+    and shared by the submit row, the hints, the export actions and the
+    transition messages. Unpacks like the former `(field, button_name, name)`
+    tuples of the submit row.
+    """
+    __slots__ = (
+        'field', 'name', 'button_name', 'hint_name', 'source', 'target',
+        'css_classes', 'confirm', 'transition',
+    )
+
+    def __init__(self, field, name, button_name, hint_name, source, target,
+                 css_classes='', confirm=False, transition=None):
+        values = (field, name, button_name, hint_name, source, target,
+                  css_classes, confirm, transition)
+        for attr, value in zip(self.__slots__, values):
+            object.__setattr__(self, attr, value)
+
+    @property
+    def conditions(self):
+        """
+        The conditions of the underlying django-fsm transition.
+        """
+        return getattr(self.transition, 'conditions', None) or ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AdminTransition is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('AdminTransition is immutable')
+
+    def __iter__(self):
+        return iter((self.field, self.button_name, self.name))
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return '<AdminTransition: %s.%s>' % (self.field, self.name)
+
+
 class FSMTransitionMixin(object):
     """
     Mixin to use with `admin.ModelAdmin` to support transitioning
@@ -44,6 +112,19 @@ class FSMTransitionMixin(object):
       in the submit row will not be available.
     * In the absence of specific transition permissions, the user must
       have change permission for the model.
+    * Adding `confirm=True` to the transition's `custom` dict asks the user
+      for confirmation before the transition button submits the form.
+    * To export the selected objects along with the transitions available
+      to the user, add the export actions to the admin:
+
+          actions = ['export_fsm_transitions_csv', 'export_fsm_transitions_json']
+
+    * With `DEBUG = True`, a `RuntimeWarning` is issued when a single change
+      or changelist request evaluates more transition conditions than
+      `FSM_ADMIN_CONDITION_BUDGET`, or runs more queries than
+      `FSM_ADMIN_QUERY_BUDGET` (both unset by default). The
+      `fsm_condition_budget` and `fsm_query_budget` attributes override
+      the settings for a single admin.
     """
     # Each transition input is named with the state field and transition.
     # e.g. _fsmtransition-publish_state-publish
@@ -53,23 +134,134 @@ class FSMTransitionMixin(object):
     fsm_field = ['state']
     change_form_template = 'fsm_admin/change_form.html'
     default_disallow_transition = not getattr(settings, 'FSM_ADMIN_FORCE_PERMIT', False)
+    # Upper bounds of transition condition evaluations and queries for a
+    # single admin request, only checked in DEBUG mode. Defaults to the
+    # FSM_ADMIN_CONDITION_BUDGET and FSM_ADMIN_QUERY_BUDGET settings.
+    fsm_condition_budget = None
+    fsm_query_budget = None
+
+    def __init__(self, *args, **kwargs):
+        super(FSMTransitionMixin, self).__init__(*args, **kwargs)
+        # `AdminTransition`s built so far, see `get_admin_transition`
+        self._fsm_admin_transitions = {}
+        # Admin transitions possible from each state, see `_fsm_get_state_transitions`
+        self._fsm_state_transitions = {}
 
     def _fsm_get_transitions(self, obj, request, perms=None):
         """
         Gets a list of transitions available to the user.
 
-        Available state transitions are provided by django-fsm
-        following the pattern get_available_FIELD_transitions
+        Available state transitions are looked up like django-fsm
+        does for get_available_user_FIELD_transitions
         """
-        user = request.user
-        fsm_fields = self._get_fsm_field_list()
+        return self._fsm_evaluate_transitions(obj, request, perms)[0]
 
+    def _fsm_evaluate_transitions(self, obj, request, perms=None):
+        """
+        Evaluates the conditions of the admin transitions possible from the
+        current state of `obj` once, and returns both the transitions available
+        to the user and the hints for the unmet conditions.
+
+        `perms` is an optional dict caching the permission checks that don't
+        depend on the instance, across calls for the same user.
+        """
+        user = request.user
         transitions = {}
-        for field in fsm_fields:
-            transitions_func = 'get_available_user_{0}_transitions'.format(field)
-            transitions_generator = getattr(obj, transitions_func)(user) if obj else []
-            transitions[field] = self._filter_admin_transitions(transitions_generator)
-        return transitions
+        hints = defaultdict(list)
+        for field in self._get_fsm_field_list():
+            transitions[field] = []
+            if not obj:
+                continue
+            for transition in self._fsm_get_state_transitions(obj, field):
+                unmet_conditions = self._fsm_unmet_conditions(obj, transition, request)
+                for condition in unmet_conditions:
+                    hint = getattr(condition, 'hint', '')
+                    if hint:
+                        hints[self.get_admin_transition(field, transition).hint_name].append(hint)
+                if not unmet_conditions and self._fsm_has_perm(obj, transition, user, perms):
+                    transitions[field].append(transition)
+        return transitions, dict(hints)
+
+    def _fsm_get_state_transitions(self, obj, field):
+        """
+        Gets the admin transitions of `field` possible from the current state
+        of `obj`, resolved like django-fsm does. They don't depend on the
+        instance, so they are looked up once per state.
+        """
+        state = getattr(obj, field)
+        key = (field, state)
+        if key not in self._fsm_state_transitions:
+            fsmfield = self.fsm_field_instance(field)
+            transitions = []
+            for method in fsmfield.transitions[self.model].values():
+                meta = method._django_fsm
+                if meta.has_transition(state):
+                    transitions.append(meta.get_transition(state))
+            self._fsm_state_transitions[key] = list(self._filter_admin_transitions(transitions))
+        return self._fsm_state_transitions[key]
+
+    def _fsm_unmet_conditions(self, obj, transition, request):
+        """
+        Evaluates every condition of `transition` for `obj` and returns
+        the unmet ones
+        """
+        unmet_conditions = []
+        for condition in transition.conditions or ():
+            self._fsm_count_conditions(request)
+            if not condition(obj):
+                unmet_conditions.append(condition)
+        return unmet_conditions
+
+    def _fsm_has_perm(self, obj, transition, user, perms=None):
+        """
+        Checks the transition permission, caching it in `perms` unless it
+        is a callable depending on the instance
+        """
+        if perms is None or callable(transition.permission):
+            return transition.has_perm(obj, user)
+        key = (transition.name, transition.source)
+        if key not in perms:
+            perms[key] = transition.has_perm(obj, user)
+        return perms[key]
+
+    def _fsm_get_admin_transitions(self, obj, request):
+        """
+        Same as `_fsm_get_transitions`, but with `AdminTransition` descriptors.
+        """
+        transitions = self._fsm_get_transitions(obj, request)
+        return dict(
+            (field, [self.get_admin_transition(field, t) for t in field_transitions])
+            for field, field_transitions in transitions.items()
+        )
+
+    def get_admin_transition(self, field, transition):
+        """
+        Returns the `AdminTransition` describing `transition` of the FSM
+        field `field`, building it on first use.
+        """
+        key = (field, transition.name, transition.source, get_language())
+        admin_transition = self._fsm_admin_transitions.get(key)
+        if admin_transition is None:
+            custom = getattr(transition, 'custom', {})
+            if custom.get('button_name'):
+                button_name = hint_name = custom['button_name']
+            else:
+                # Make the function name the button title, but prettier
+                button_name = '{0} {1}'.format(
+                    transition.name.replace('_', ' '), self.model._meta.verbose_name).title()
+                hint_name = transition.name.title()
+            admin_transition = self._fsm_admin_transitions[key] = AdminTransition(
+                field=field,
+                name=transition.name,
+                button_name=button_name,
+                hint_name=hint_name,
+                source=transition.source,
+                target=transition.target,
+                css_classes='default transition-{0}'.format(transition.name),
+                confirm=bool(custom.get('confirm', False)),
+                transition=transition,
+            )
+        return admin_transition
 
     def get_redirect_url(self, request, obj):
         """
@@ -120,10 +312,18 @@ class FSMTransitionMixin(object):
         """
         Checks if the requested transition is available
         """
-        transitions = []
-        for field, field_transitions in iter(self._fsm_get_transitions(obj, request).items()):
-            transitions += [t.name for t in field_transitions]
-        return transition in transitions
+        return self._get_available_admin_transition(obj, transition, request) is not None
+
+    def _get_available_admin_transition(self, obj, transition, request):
+        """
+        Returns the `AdminTransition` for the requested transition, or None
+        if it is not available
+        """
+        for field_transitions in self._fsm_get_admin_transitions(obj, request).values():
+            for admin_transition in field_transitions:
+                if admin_transition.name == transition:
+                    return admin_transition
+        return None
 
     def _filter_admin_transitions(self, transitions_generator):
         """
@@ -162,19 +362,24 @@ class FSMTransitionMixin(object):
             'original_state': original_state,
         }
         # Ensure the requested transition is available
-        available = self._is_transition_available(obj, transition, request)
+        admin_transition = self._get_available_admin_transition(obj, transition, request)
         trans_func = getattr(obj, transition, None)
-        if available and trans_func:
+        if admin_transition and trans_func:
+            # django-fsm evaluates the conditions again on each call
+            conditions = len(admin_transition.conditions)
             # Run the transition
             try:
                 # Attempt to pass in the request and by argument if using django-fsm-log
+                self._fsm_count_conditions(request, conditions)
                 trans_func(request=request, by=request.user)
             except TypeError:
                 try:
                     # Attempt to pass in the by argument if using django-fsm-log
+                    self._fsm_count_conditions(request, conditions)
                     trans_func(by=request.user)
                 except TypeError:
                     # If the function does not have a by attribute, just call with no arguments
+                    self._fsm_count_conditions(request, conditions)
                     trans_func()
             new_state = self.display_fsm_field(obj, fsm_field_name)
 
@@ -196,43 +401,110 @@ class FSMTransitionMixin(object):
         super(FSMTransitionMixin, self).save_model(request, obj, form, change)
 
     def change_view(self, request, object_id, form_url='', extra_context=None):
-        try:
-            return super(FSMTransitionMixin, self).change_view(request, object_id, form_url, extra_context)
-        except ConcurrentTransition as err:
-            messages.error(request, err)
-            return HttpResponseRedirect(request.path)
+        def view():
+            try:
+                return super(FSMTransitionMixin, self).change_view(request, object_id, form_url, extra_context)
+            except ConcurrentTransition as err:
+                messages.error(request, err)
+                return HttpResponseRedirect(request.path)
+        return self._fsm_budget_view(request, view)
+
+    def changelist_view(self, request, extra_context=None):
+        def view():
+            return super(FSMTransitionMixin, self).changelist_view(request, extra_context)
+        return self._fsm_budget_view(request, view)
+
+    def _fsm_budget_view(self, request, view):
+        """
+        Runs `view`, counting the transition conditions it evaluates and the
+        queries it runs in DEBUG mode, and warns if it goes over the budget.
+
+        The response is rendered right away so that the templates are
+        accounted for.
+        """
+        if not settings.DEBUG:
+            return view()
+
+        budget = request._fsm_admin_budget = {'conditions': 0, 'queries': 0}
+
+        def count_query(execute, sql, params, many, context):
+            budget['queries'] += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+            response = view()
+            if not getattr(response, 'is_rendered', True):
+                response.render()
+
+        # Streamed responses run most of their queries later on
+        if not getattr(response, 'streaming', False):
+            self._fsm_budget_check(request, budget)
+        return response
 
-    def get_transition_hints(self, obj):
+    def _fsm_count_conditions(self, request, count=1):
+        budget = getattr(request, '_fsm_admin_budget', None)
+        if budget is not None:
+            budget['conditions'] += count
+
+    def _fsm_budget_check(self, request, budget):
+        """
+        Warns if the request went over the condition or query budget
+        """
+        condition_budget = self.fsm_condition_budget
+        if condition_budget is None:
+            condition_budget = getattr(settings, 'FSM_ADMIN_CONDITION_BUDGET', None)
+        query_budget = self.fsm_query_budget
+        if query_budget is None:
+            query_budget = getattr(settings, 'FSM_ADMIN_QUERY_BUDGET', None)
+
+        if condition_budget is not None and budget['conditions'] > condition_budget:
+            warnings.warn(
+                '%s evaluated %d transition conditions, over the budget of %d' % (
+                    request.path, budget['conditions'], condition_budget),
+                RuntimeWarning)
+        if query_budget is not None and budget['queries'] > query_budget:
+            warnings.warn(
+                '%s ran %d queries, over the budget of %d' % (
+                    request.path, budget['queries'], query_budget),
+                RuntimeWarning)
+
+    def get_transition_hints(self, obj, transitions=None, request=None):
         """
         See `fsm_transition_hints` templatetag.
+
+        `transitions` may be given to reuse the `AdminTransition`s already
+        looked up for an object in the same state. If `request` is given,
+        the evaluated conditions count against its budget.
         """
         hints = defaultdict(list)
-        transitions = self._get_possible_transitions(obj)
+        if transitions is None:
+            transitions = self._get_possible_admin_transitions(obj)
 
         # Step through the conditions needed to accomplish the legal state
         # transitions, and alert the user of any missing condition.
-        # TODO?: find a cleaner way to enumerate conditions methods?
         for transition in transitions:
-            for condition in transition.conditions:
-
-                # If the condition is valid, then we don't need the hint
-                if condition(obj):
-                    continue
-
-                # if the transition is hidden, we don't need the hint
-                if not transition.custom.get('admin', self.default_disallow_transition):
-                    continue
-
+            for condition in self._fsm_unmet_conditions(obj, transition, request):
                 hint = getattr(condition, 'hint', '')
                 if hint:
-                    if hasattr(transition, 'custom') and transition.custom.get(
-                            'button_name'):
-                        hints[transition.custom['button_name']].append(hint)
-                    else:
-                        hints[transition.name.title()].append(hint)
+                    hints[transition.hint_name].append(hint)
 
         return dict(hints)
 
+    def _get_possible_admin_transitions(self, obj):
+        """
+        Get the `AdminTransition`s valid from the current state of `obj`,
+        leaving out the transitions hidden from the admin
+        """
+        possible_transitions = list(self._get_possible_transitions(obj))
+        for field in self._get_fsm_field_list():
+            names = set(t.name for t in self.fsm_field_instance(field).get_all_transitions(self.model))
+            transitions = self._filter_admin_transitions(
+                t for t in possible_transitions if t.name in names)
+            for transition in transitions:
+                yield self.get_admin_transition(field, transition)
+
     def _get_possible_transitions(self, obj):
         """
         Get valid state transitions from the current state of `obj`
@@ -256,3 +528,77 @@ class FSMTransitionMixin(object):
             return [self.fsm_field]
 
         return self.fsm_field
+
+    def _fsm_export_rows(self, request, queryset):
+        """
+        Yields a dict per object of `queryset` holding its FSM field values,
+        the admin transitions available to the user and the unmet hints.
+
+        The queryset is consumed with `iterator()` so the selection is never
+        cached. The possible transitions and their permissions are looked up
+        once per state, and the conditions are evaluated once per object.
+        """
+        fsm_fields = self._get_fsm_field_list()
+        perms = {}
+        for obj in queryset.iterator():
+            transitions, hints = self._fsm_evaluate_transitions(obj, request, perms)
+            row = {'pk': obj.pk, 'object': force_str(obj)}
+            for field in fsm_fields:
+                row[field] = getattr(obj, field)
+                row['%s_transitions' % field] = [t.name for t in transitions[field]]
+            row['hints'] = dict(
+                (force_str(action), [force_str(hint) for hint in action_hints])
+                for action, action_hints in hints.items()
+            )
+            yield row
+
+    def _fsm_export_filename(self, extension):
+        return '%s-transitions.%s' % (self.model._meta.model_name, extension)
+
+    def export_fsm_transitions_csv(self, request, queryset):
+        """
+        Admin action streaming the selected objects as CSV, with the
+        transitions available to the user and the hints for the others.
+        Cells that spreadsheets would run as formulas are prefixed with `'`.
+        """
+        fsm_fields = self._get_fsm_field_list()
+        columns = ['pk', 'object']
+        for field in fsm_fields:
+            columns += [field, '%s_transitions' % field]
+        columns.append('hints')
+        writer = csv.writer(_Echo())
+
+        def rows():
+            yield writer.writerow(columns)
+            for row in self._fsm_export_rows(request, queryset):
+                for field in fsm_fields:
+                    row['%s_transitions' % field] = ' '.join(row['%s_transitions' % field])
+                row['hints'] = '; '.join(
+                    '%s: %s' % (action, hint)
+                    for action, action_hints in sorted(row['hints'].items())
+                    for hint in action_hints
+                )
+                yield writer.writerow([_csv_safe(row[column]) for column in columns])
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="%s"' % self._fsm_export_filename('csv')
+        return response
+    export_fsm_transitions_csv.short_description = _('Export available transitions (CSV)')
+
+    def export_fsm_transitions_json(self, request, queryset):
+        """
+        Admin action streaming the selected objects as a JSON array, with the
+        transitions available to the user and the hints for the others.
+        """
+        encoder = DjangoJSONEncoder()
+
+        def chunks():
+            yield '['
+            for i, row in enumerate(self._fsm_export_rows(request, queryset)):
+                yield (',' if i else '') + encoder.encode(row)
+            yield ']'
+
+        response = StreamingHttpResponse(chunks(), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="%s"' % self._fsm_export_filename('json')
+        return response
+    export_fsm_transitions_json.short_description = _('Export available transitions (JSON)')
@@ -3,7 +3,6 @@ import logging
 from django import template
 from django.contrib.admin.templatetags.admin_modify import submit_row
 from django.conf import settings
-from django.db import models
 
 register = template.Library()
 
@@ -31,11 +30,11 @@ def fsm_submit_button(transition):
     Render a submit button that requests an fsm state transition for a
     single state.
     """
-    fsm_field_name, button_value, transition_name = transition
     return {
-        'button_value': button_value,
-        'fsm_field_name': fsm_field_name,
-        'transition_name': transition_name,
+        'transition': transition,
+        'button_value': transition.button_name,
+        'fsm_field_name': transition.field,
+        'transition_name': transition.name,
     }
 
 
@@ -46,34 +45,18 @@ def fsm_submit_row(context):
     to change the state of an FSMField.
     """
     original = context.get('original', None)
-    model_name = ''
-    if original is not None:
-        # TODO: replace the following line by `original is models.DEFERRED`
-        # after dropping support for Django-1.9
-        if getattr(original, '_deferred', False) or original is getattr(models, 'DEFERRED', None):
-            model_name = type(original).__base__._meta.verbose_name
-        else:
-            model_name = original.__class__._meta.verbose_name
-
-    def button_name(transition):
-        if hasattr(transition, 'custom') and 'button_name' in transition.custom:
-            return transition.custom['button_name']
-        else:
-            # Make the function name the button title, but prettier
-            return '{0} {1}'.format(transition.name.replace('_', ' '), model_name).title()
 
     # The model admin defines which field we're dealing with
     # and has some utils for getting the transitions.
     request = context['request']
     model_admin = context.get('adminform').model_admin
-    transitions = model_admin._fsm_get_transitions(original, request)
+    transitions = model_admin._fsm_get_admin_transitions(original, request)
 
     ctx = submit_row(context)
     ctx['transitions'] = []
     for field, field_transitions in iter(transitions.items()):
         ctx['transitions'] += sorted(
-            [(field, button_name(t), t.name) for t in field_transitions],
-            key=lambda e: e[1], reverse=True
+            field_transitions, key=lambda t: t.button_name, reverse=True
         )
     ctx['perms'] = context['perms']
 
@@ -92,5 +75,5 @@ def fsm_transition_hints(context):
 
     model_admin = context.get('adminform').model_admin
     return {
-        'transition_hints': model_admin.get_transition_hints(original)
+        'transition_hints': model_admin.get_transition_hints(original, request=context.get('request'))
     }
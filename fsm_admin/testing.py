@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class FSMAdminBudgetTestMixin(object):
+    """
+    Mixin to use with `django.test.TestCase` to guard the number of queries
+    and transition condition evaluations of `FSMTransitionMixin` admin views.
+
+    Conditions are only counted by `FSMTransitionMixin` in DEBUG mode, so the
+    tests using `assertMaxConditions` need `override_settings(DEBUG=True)`.
+
+        @override_settings(DEBUG=True)
+        class YourModelAdminTests(FSMAdminBudgetTestMixin, TestCase):
+
+            def test_change_view(self):
+                with self.assertMaxQueries(10):
+                    response = self.client.get(url)
+                self.assertMaxConditions(2, response)
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, num, using=DEFAULT_DB_ALIAS):
+        """
+        Asserts that at most `num` queries run inside the block.
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        self.assertLessEqual(
+            executed, num,
+            '%d queries executed, at most %d expected\n%s' % (
+                executed, num,
+                '\n'.join(query['sql'] for query in context.captured_queries))
+        )
+
+    def assertMaxConditions(self, num, response):
+        """
+        Asserts that the admin request of `response` evaluated at most
+        `num` transition conditions.
+        """
+        budget = getattr(response.wsgi_request, '_fsm_admin_budget', None)
+        self.assertIsNotNone(budget, 'Transition conditions are only counted in DEBUG mode')
+        self.assertLessEqual(
+            budget['conditions'], num,
+            '%d transition conditions evaluated, at most %d expected' % (budget['conditions'], num)
+        )